@@ -12,13 +12,61 @@ This lets you defer expensive LLM calls and progressively enrich conversation re
 """
 
 import json
+import os
 import uuid
-import re
+import string
 import argparse
+import copy
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Tuple, Any
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # optional speedup, fall back to stdlib json
+    orjson = None
+
+
+# Character classes for the hand-written address scanner
+_TLD_ALPHABET = string.ascii_letters
+_DOMAIN_ALPHABET = string.ascii_letters + string.digits + '.-'
+_LOCAL_ALPHABET = string.ascii_letters + string.digits + '._%+-'
+_TLD_CHARS = frozenset(_TLD_ALPHABET)
+_DOMAIN_CHARS = frozenset(_DOMAIN_ALPHABET)
+_LOCAL_CHARS = frozenset(_LOCAL_ALPHABET)
+
+# ASCII bytes dropped from filename slugs (everything except a-z, 0-9 and space)
+_SLUG_DELETE = bytes(
+    b for b in range(128) if b not in b'abcdefghijklmnopqrstuvwxyz0123456789 '
+)
+
+
+def _dumps_bytes(obj: Any, indent: Optional[int] = 2) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes, using orjson when it is installed"""
+    if orjson is not None and indent in (None, 2):
+        # Route datetimes and dataclasses through default=str like stdlib json
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, option=option, default=str)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits, which stdlib json accepts
+            pass
+    return json.dumps(obj, indent=indent, default=str).encode()
+
+
+def _dumps(obj: Any, indent: Optional[int] = 2) -> str:
+    """Serialize obj to a JSON string (see _dumps_bytes)"""
+    return _dumps_bytes(obj, indent=indent).decode()
+
+
+def _loads(raw: bytes) -> Any:
+    """Parse JSON from raw bytes in a single call, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
 
 class VconValidationError(Exception):
     """Raised when input data is invalid or missing required fields"""
@@ -29,8 +77,18 @@ class VconGenerator:
     """Generates vCon documents from email data"""
 
     VCON_VERSION = "0.0.1"
-    VALID_SOURCE_TYPES = {"email_thread", "forwarded_email"}
-    VALID_PARTICIPANT_ROLES = {"from", "to", "cc"}
+    VALID_SOURCE_TYPES = frozenset({"email_thread", "forwarded_email"})
+    VALID_PARTICIPANT_ROLES = frozenset({"from", "to", "cc"})
+    _SOURCE_TYPES_LIST = ', '.join(sorted(VALID_SOURCE_TYPES))
+
+    # (input field, analysis type, schema) in output order
+    _ANALYSIS_TYPES = (
+        ('summary', 'summary', 'text/plain'),
+        ('category', 'category', 'text/plain'),
+        ('action_items', 'action-items', 'application/json'),
+        ('key_topics', 'key-topics', 'application/json'),
+        ('key_decisions', 'key-decisions', 'application/json'),
+    )
 
     def __init__(self) -> None:
         self._reset()
@@ -50,6 +108,8 @@ class VconGenerator:
             "attachments": [],
             "sources": []
         }
+        # Ids of to/cc participants in order, recorded by _add_participants
+        self._recipient_ids: List[str] = []
 
     def generate_base(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -78,26 +138,49 @@ class VconGenerator:
         Raises:
             VconValidationError: If required fields are missing or invalid
         """
+        return self._build_base(data, str(uuid.uuid4()), datetime.now(timezone.utc).isoformat())
+
+    @classmethod
+    def generate_batch(cls, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Phase 1 for many emails at once.
+
+        Reuses one generator, one creation timestamp and a single os.urandom
+        call for all UUIDs instead of paying that setup per email.
+
+        Args:
+            records: List of input dicts, each with the same keys as generate_base()
+
+        Returns:
+            List of vCon dicts (0.0.1), in input order
+
+        Raises:
+            VconValidationError: If any record is missing required fields or invalid
+        """
+        gen = cls()
+        now_iso = datetime.now(timezone.utc).isoformat()
+        rand = os.urandom(16 * len(records))
+        return [
+            gen._build_base(data, str(uuid.UUID(bytes=rand[i * 16:i * 16 + 16], version=4)), now_iso)
+            for i, data in enumerate(records)
+        ]
+
+    def _build_base(self, data: Dict[str, Any], vcon_uuid: str, now_iso: str) -> Dict[str, Any]:
+        """Build a fresh 0.0.1 vCon from data with the given UUID and creation time"""
         self._reset()
         self._validate_input(data)
 
-        self.vcon["uuid"] = str(uuid.uuid4())
-        now = datetime.now(timezone.utc).isoformat()
-        self.vcon["created_at"] = now
-        self.vcon["updated_at"] = now
+        self.vcon["uuid"] = vcon_uuid
+        self.vcon["created_at"] = now_iso
+        self.vcon["updated_at"] = now_iso
 
-        # Set type from source
+        # Set type from source (already checked by _validate_input)
         source = data.get('source', 'email_thread')
-        if source not in self.VALID_SOURCE_TYPES:
-            raise VconValidationError(
-                f"Invalid source type '{source}'. Must be one of: {', '.join(self.VALID_SOURCE_TYPES)}"
-            )
-        
         self.vcon["type"] = "email_forwarded" if source == "forwarded_email" else "email_thread"
 
         self._add_conversation_metadata(data)
         self._add_participants(data)
-        self._add_events(data)
+        self._add_events(data, now_iso)
         self._add_sources(data)
 
         return self.vcon
@@ -149,7 +232,7 @@ class VconGenerator:
         source = data.get('source', 'email_thread')
         if source not in self.VALID_SOURCE_TYPES:
             raise VconValidationError(
-                f"Invalid source type '{source}'. Must be one of: {', '.join(self.VALID_SOURCE_TYPES)}"
+                f"Invalid source type '{source}'. Must be one of: {self._SOURCE_TYPES_LIST}"
             )
 
     # ── Conversation Metadata ──────────────────────────────────────────
@@ -166,70 +249,64 @@ class VconGenerator:
     # ── Participants ───────────────────────────────────────────────────
 
     def _add_participants(self, data: Dict[str, Any]) -> None:
-        """Add participants with email addresses and roles"""
+        """Add participants with email addresses and roles, deduplicated case-insensitively"""
+        participants = self.vcon["participants"]
+        recipient_ids = self._recipient_ids
         added: set = set()
         pid = 1
 
-        # Add sender (from field)
+        # Add sender (from field), first address only
         from_field = data.get('from', '')
-        if from_field:
-            email = self._extract_email(from_field)
-            name = self._extract_name(from_field) or email
-            if email and email not in added:
-                self.vcon["participants"].append({
+        if from_field and isinstance(from_field, str):
+            email, name = self._parse_addr(from_field.strip())
+            if email:
+                participants.append({
                     "id": f"p{pid}",
-                    "name": name,
+                    "name": name or email,
                     "email": email,
                     "role": "from"
                 })
-                added.add(email)
+                added.add(email.lower())
                 pid += 1
 
-        # Add recipients (to field)
-        to_field = data.get('to', '')
-        if to_field:
-            for email, name in self._extract_all_emails(to_field):
-                if email and email not in added:
-                    self.vcon["participants"].append({
-                        "id": f"p{pid}",
-                        "name": name,
-                        "email": email,
-                        "role": "to"
-                    })
-                    added.add(email)
-                    pid += 1
-
-        # Add CC recipients
-        cc_field = data.get('cc', '')
-        if cc_field:
-            for email, name in self._extract_all_emails(cc_field):
-                if email and email not in added:
-                    self.vcon["participants"].append({
-                        "id": f"p{pid}",
-                        "name": name,
-                        "email": email,
-                        "role": "cc"
-                    })
-                    added.add(email)
-                    pid += 1
+        # Add recipients (to field), then CC recipients
+        for role in ('to', 'cc'):
+            field = data.get(role, '')
+            if not field:
+                continue
+            for email, name in self._extract_all_emails(field):
+                key = email.lower()
+                if key in added:
+                    continue
+                participant_id = f"p{pid}"
+                participants.append({
+                    "id": participant_id,
+                    "name": name,
+                    "email": email,
+                    "role": role
+                })
+                recipient_ids.append(participant_id)
+                added.add(key)
+                pid += 1
 
     # ── Events ─────────────────────────────────────────────────────────
 
-    def _add_events(self, data: Dict[str, Any]) -> None:
-        """Add email message events"""
+    def _add_events(self, data: Dict[str, Any], default_ts: str) -> None:
+        """Add email message events, using default_ts when no usable entry_date is given"""
         ts = data.get('entry_date')
         if ts is None:
-            ts = datetime.now(timezone.utc)
-        if isinstance(ts, datetime):
+            ts = default_ts
+        elif isinstance(ts, datetime):
             ts = ts.isoformat()
         elif isinstance(ts, str):
+            if ts.endswith('Z'):
+                ts = ts[:-1] + '+00:00'
             # Ensure ISO format
             try:
-                parsed = datetime.fromisoformat(ts.replace('Z', '+00:00'))
-                ts = parsed.isoformat()
+                ts = datetime.fromisoformat(ts).isoformat()
             except ValueError:
-                # Fall back to current time if parsing fails
-                ts = datetime.now(timezone.utc).isoformat()
+                # Fall back to creation time if parsing fails
+                ts = default_ts
 
         if data.get('is_forwarded') and data.get('user_note') and data.get('original_content'):
             # Forwarded email: two message events
@@ -249,7 +326,7 @@ class VconGenerator:
             })
             
             # Clean forwarded subject (remove Fwd:, FW:, etc.)
-            fwd_subject = re.sub(r'^(Fwd?|FW|Fw):\s*', '', data.get('subject', ''), flags=re.IGNORECASE)
+            fwd_subject = self._strip_fwd_prefix(data.get('subject', ''))
             
             self.vcon["events"].append({
                 "id": "m2",
@@ -270,8 +347,8 @@ class VconGenerator:
             # Single message event
             content = data.get('content', '')
             if content:
-                # Build recipient list
-                to_ids = [p["id"] for p in self.vcon["participants"] if p["role"] in ("to", "cc")]
+                # Recipient list, limited to the first 10 recipients
+                to_ids = self._recipient_ids[:10]
                 
                 event: Dict[str, Any] = {
                     "id": "m1",
@@ -280,7 +357,7 @@ class VconGenerator:
                     "direction": "inbound",
                     "timestamp": ts,
                     "from": "p1",
-                    "to": to_ids[:10],  # Limit to first 10 recipients
+                    "to": to_ids,
                     "subject": data.get('subject', ''),
                     "body": {
                         "content_type": "text/plain",
@@ -321,27 +398,23 @@ class VconGenerator:
     def _add_analysis_entries(self, data: Dict[str, Any]) -> None:
         """Add analysis entries to vCon"""
         vendor = data.get('source', 'llm')
+        analysis = self.vcon["analysis"]
 
-        analysis_types = [
-            ('summary', 'summary', 'text/plain'),
-            ('category', 'category', 'text/plain'),
-            ('action_items', 'action-items', 'application/json'),
-            ('key_topics', 'key-topics', 'application/json'),
-            ('key_decisions', 'key-decisions', 'application/json'),
-        ]
-
-        for field, atype, schema in analysis_types:
+        for field, atype, schema in self._ANALYSIS_TYPES:
             value = data.get(field)
             if not value:
                 continue
-            body = value if isinstance(value, str) else json.dumps(value, indent=2)
-            self.vcon["analysis"].append({
+            # JSON bodies stay native until export (see _export_dict); copy them
+            # so later changes to the caller's data don't leak into the vCon
+            if not isinstance(value, str):
+                value = copy.deepcopy(value)
+            analysis.append({
                 "type": atype,
                 "dialog": 0,
                 "vendor": vendor,
                 "product": "vcon-parser",
                 "schema": schema,
-                "body": body,
+                "body": value,
                 "encoding": "utf-8"
             })
 
@@ -361,23 +434,7 @@ class VconGenerator:
         if not field or not isinstance(field, str):
             return None
         
-        field = field.strip()
-        
-        # Try angle bracket format first
-        m = re.search(r'<([^>]+)>', field)
-        if m:
-            email = m.group(1).strip()
-            if VconGenerator._is_valid_email(email):
-                return email
-        
-        # Try bare email address
-        m = re.search(r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})', field)
-        if m:
-            email = m.group(1).strip()
-            if VconGenerator._is_valid_email(email):
-                return email
-        
-        return None
+        return VconGenerator._parse_addr(field.strip())[0]
 
     @staticmethod
     def _extract_name(field: str) -> Optional[str]:
@@ -392,18 +449,7 @@ class VconGenerator:
         if not field or not isinstance(field, str):
             return None
         
-        field = field.strip()
-        
-        # Try to extract name before <email>
-        m = re.match(r'^(.+?)\s*<', field)
-        if m:
-            name = m.group(1).strip()
-            # Remove surrounding quotes if present
-            name = name.strip('"').strip("'").strip()
-            if name and len(name) > 0:
-                return name
-        
-        return None
+        return VconGenerator._parse_addr(field.strip())[1]
 
     @staticmethod
     def _extract_all_emails(field: str) -> List[Tuple[str, str]]:
@@ -418,41 +464,149 @@ class VconGenerator:
         
         results: List[Tuple[str, str]] = []
         
-        # Split on commas or semicolons, but be careful with quoted names
-        # Pattern handles: "Name" <email>, Name <email>, email
-        parts = re.split(r',(?=(?:[^"]*"[^"]*")*[^"]*$)', field)
-        
-        for part in parts:
+        for part in VconGenerator._split_addresses(field):
             part = part.strip()
             if not part:
                 continue
             
-            email = VconGenerator._extract_email(part)
+            email, name = VconGenerator._parse_addr(part)
             if email:
-                name = VconGenerator._extract_name(part)
                 results.append((email, name or email))
         
         return results
 
+    @staticmethod
+    def _split_addresses(field: str) -> List[str]:
+        """
+        Split an address list on commas or semicolons outside double quotes.
+        
+        Keeps "Last, First" <email@example.com> together as one part.
+        An unpaired final quote is treated as a literal character.
+        """
+        if '"' not in field:
+            return field.replace(';', ',').split(',')
+        
+        segments = field.split('"')
+        if len(segments) % 2 == 0:
+            # Odd quote count: rejoin around the last quote so it cannot
+            # swallow the rest of the list
+            segments[-2:] = [segments[-2] + '"' + segments[-1]]
+        
+        # Odd-numbered segments between quotes are never split
+        parts: List[str] = ['']
+        for i, segment in enumerate(segments):
+            if i:
+                parts[-1] += '"'
+            if i % 2:
+                parts[-1] += segment
+            else:
+                first, *rest = segment.replace(';', ',').split(',')
+                parts[-1] += first
+                parts.extend(rest)
+        return parts
+
+    @staticmethod
+    def _parse_addr(part: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Parse a single address into an (email, name) tuple using plain string scans.
+        
+        Either element is None when not present. An invalid address inside
+        angle brackets falls back to the first bare address in the text.
+        """
+        name = None
+        lt = part.find('<')
+        if lt != -1:
+            # Display name precedes the angle bracket; strip surrounding quotes
+            name = part[:lt].strip().strip('"').strip("'").strip() or None
+            gt = part.find('>', lt + 1)
+            if gt != -1:
+                email = part[lt + 1:gt].strip()
+                if VconGenerator._is_valid_email(email):
+                    return email, name
+        
+        return VconGenerator._scan_bare_email(part), name
+
+    @staticmethod
+    def _scan_bare_email(text: str) -> Optional[str]:
+        """Find the first bare local@domain.tld address in text"""
+        # Fast path: the whole text is a single plain address. strip(alphabet)
+        # leaves nothing only when every character is in that alphabet.
+        local, at_sign, domain = text.partition('@')
+        if at_sign and local and '@' not in domain:
+            head, dot, tld = domain.rpartition('.')
+            if (head and len(tld) >= 2 and not local.strip(_LOCAL_ALPHABET)
+                    and not head.strip(_DOMAIN_ALPHABET) and not tld.strip(_TLD_ALPHABET)):
+                return text
+        
+        # Otherwise scan for an address embedded in other text
+        n = len(text)
+        at = text.find('@')
+        while at != -1:
+            # Expand left over the local part and right over the domain
+            start = at
+            while start > 0 and text[start - 1] in _LOCAL_CHARS:
+                start -= 1
+            end = at + 1
+            while end < n and text[end] in _DOMAIN_CHARS:
+                end += 1
+            
+            if start < at:
+                # The domain must end in a dot followed by 2+ letters
+                dot = text.rfind('.', at + 2, end)
+                while dot != -1:
+                    tld_end = dot + 1
+                    while tld_end < end and text[tld_end] in _TLD_CHARS:
+                        tld_end += 1
+                    if tld_end - dot > 2:
+                        email = text[start:tld_end]
+                        if VconGenerator._is_valid_email(email):
+                            return email
+                        break
+                    dot = text.rfind('.', at + 2, dot)
+            
+            at = text.find('@', at + 1)
+        
+        return None
+
+    @staticmethod
+    def _strip_fwd_prefix(subject: str) -> str:
+        """Remove a leading "Fwd:" / "FW:" (any case) and the whitespace after it"""
+        head = subject[:4].lower()
+        if head.startswith('fw:'):
+            return subject[3:].lstrip()
+        if head.startswith('fwd:'):
+            return subject[4:].lstrip()
+        return subject
+
     @staticmethod
     def _is_valid_email(email: str) -> bool:
         """Basic email validation"""
-        if not email or '@' not in email:
-            return False
-        # Simple check: has @ and at least one dot after @
-        parts = email.split('@')
-        if len(parts) != 2:
-            return False
-        local, domain = parts
-        if not local or not domain or '.' not in domain:
-            return False
-        return True
+        # Simple check: exactly one @ with a non-empty local part and a dot after it
+        at = email.find('@')
+        return at > 0 and at == email.rfind('@') and email.find('.', at + 1) != -1
 
     # ── Export ─────────────────────────────────────────────────────────
 
     def to_json(self, indent: int = 2) -> str:
         """Export vCon as JSON string"""
-        return json.dumps(self.vcon, indent=indent, default=str)
+        return _dumps(self._export_dict(), indent=indent)
+
+    def to_bytes(self, indent: int = 2) -> bytes:
+        """Export vCon as UTF-8 encoded JSON bytes"""
+        return _dumps_bytes(self._export_dict(), indent=indent)
+
+    def _export_dict(self) -> Dict[str, Any]:
+        """Return the vCon with non-string analysis bodies encoded as JSON strings"""
+        if all(isinstance(entry["body"], str) for entry in self.vcon["analysis"]):
+            return self.vcon
+        
+        vcon = dict(self.vcon)
+        vcon["analysis"] = [
+            {**entry, "body": _dumps(entry["body"], indent=2)}
+            if not isinstance(entry["body"], str) else entry
+            for entry in self.vcon["analysis"]
+        ]
+        return vcon
 
     def to_dict(self) -> Dict[str, Any]:
         """Export vCon as dictionary"""
@@ -472,8 +626,9 @@ def generate_vcon_filename(data: Dict[str, Any]) -> str:
     
     subject = data.get('subject', 'email')
     date_str = entry_date.strftime('%Y-%m-%d')
-    slug = re.sub(r'[^a-z0-9 ]', '', subject.lower())
-    slug = '-'.join(slug.split())[:50]
+    # Non-ASCII is dropped by the encode, the remaining unwanted bytes by translate
+    slug = subject.lower().encode('ascii', 'ignore').translate(None, _SLUG_DELETE)
+    slug = b'-'.join(slug.split())[:50].decode('ascii')
     return f"{date_str}-{slug}.json"
 
 
@@ -499,27 +654,29 @@ Examples:
     try:
         # Read input
         if args.input:
-            with open(args.input) as f:
-                data = json.load(f)
+            with open(args.input, 'rb') as f:
+                data = _loads(f.read())
         else:
-            data = json.load(sys.stdin)
+            data = _loads(sys.stdin.buffer.read())
 
         gen = VconGenerator()
         vcon = gen.generate_base(data)
 
         # Optionally add analysis
         if args.analysis:
-            with open(args.analysis) as f:
-                analysis = json.load(f)
+            with open(args.analysis, 'rb') as f:
+                analysis = _loads(f.read())
             vcon = gen.add_analysis(analysis)
 
-        output = gen.to_json()
+        # Write bytes directly, skipping the intermediate str
+        output = gen.to_bytes()
         if args.output:
-            with open(args.output, 'w') as f:
+            with open(args.output, 'wb') as f:
                 f.write(output)
             print(f"✓ Wrote {args.output}", file=sys.stderr)
         else:
-            print(output)
+            sys.stdout.buffer.write(output)
+            sys.stdout.buffer.write(b'\n')
     
     except VconValidationError as e:
         print(f"❌ Validation error: {e}", file=sys.stderr)